@@ -2,13 +2,55 @@
 """GitHub Repository Validator"""
 
 import os
+import json
+import stat
 import shutil
 import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Deque, Dict, Iterator, List, Tuple
 from dataclasses import dataclass, field
 
+# Directories pruned by convention without descending. They may still hide tracked files
+# (committed dist/ or build/ output), and .git itself counts towards GitHub's repo size.
+EXCLUDED_DIRS = frozenset({
+    '.git', 'node_modules', '__pycache__', '.venv', 'venv',
+    '.mypy_cache', '.pytest_cache', 'dist', 'build',
+})
+
+# Per-directory scan results reused by incremental runs, keyed by absolute directory path.
+INDEX_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'validate_github_limits', 'index.json')
+
+# Where scandir accepts a directory fd, DirEntry.stat() becomes fstatat(dir_fd, name).
+_SCANDIR_FD = os.scandir in os.supports_fd and hasattr(os, 'O_DIRECTORY')
+
+@contextmanager
+def _scandir(path: str) -> Iterator[Iterator[os.DirEntry]]:
+    """os.scandir(path), listing through a directory fd where the platform allows."""
+    if not _SCANDIR_FD:
+        with os.scandir(path) as it:
+            yield it
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        with os.scandir(fd) as it:
+            yield it
+    finally:
+        os.close(fd)
+
+def _valid_index_entry(entry) -> bool:
+    """Check one cached directory record has the shape _scandir_recursive writes."""
+    try:
+        return (all(isinstance(entry[key], int) for key in ('mtime_ns', 'count', 'files', 'bytes'))
+                and all(isinstance(name, str) and isinstance(size, int) for name, size in entry['flagged'])
+                and all(isinstance(name, str) for name in entry['dirs']))
+    except (TypeError, KeyError, ValueError):
+        return False
+
 @dataclass
 class GitHubLimits:
     MAX_FILESIZE_MB: float = 100.0
@@ -21,171 +63,381 @@ class GitHubLimits:
 @dataclass
 class ValidationStats:
     total_files: int = 0
+    total_bytes: int = 0
     total_size_gb: float = 0
-    large_files: List[Tuple[Path, float]] = field(default_factory=list)
-    warning_files: List[Tuple[Path, float]] = field(default_factory=list)
-    large_dirs: List[Tuple[Path, int]] = field(default_factory=list)
+    large_files: List[Tuple[str, float]] = field(default_factory=list)
+    warning_files: List[Tuple[str, float]] = field(default_factory=list)
+    large_dirs: List[Tuple[str, int]] = field(default_factory=list)
+    dir_index: Dict[str, dict] = field(default_factory=dict)
+
+    def merge(self, other: 'ValidationStats') -> None:
+        self.total_files += other.total_files
+        self.total_bytes += other.total_bytes
+        self.large_files.extend(other.large_files)
+        self.warning_files.extend(other.warning_files)
+        self.large_dirs.extend(other.large_dirs)
+        self.dir_index.update(other.dir_index)
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler writing through a large buffer instead of flushing every record."""
+
+    def __init__(self, filename: str, buffer_size: int = 1 << 20, **kwargs):
+        self.buffer_size = buffer_size
+        super().__init__(filename, **kwargs)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+
+    def flush(self) -> None:
+        # StreamHandler.emit() calls this after each record; writes are
+        # left to the buffer and pushed out by flush_buffer() or close().
+        pass
+
+    def flush_buffer(self) -> None:
+        super().flush()
 
 class GitHubValidator:
-    def __init__(self, repo_dir: str, backup_dir: str, auto_move: bool = False):
+    def __init__(self, repo_dir: str, backup_dir: str, auto_move: bool = False,
+                 incremental: bool = False):
         self.repo_dir = Path(os.path.expanduser(repo_dir)).resolve()
+        self._repo_str = os.path.join(str(self.repo_dir), '')
         self.backup_dir = Path(backup_dir).resolve()
+        self._backup_str = str(self.backup_dir)
         self.auto_move = auto_move
-        self.timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.incremental = incremental
+        self.started = datetime.now()
+        self.timestamp = self.started.strftime("%Y%m%d-%H%M%S")
         self.report_file = f"github_validation_{self.timestamp}.txt"
-        self.issues: List[str] = []
+        self.issues: Deque[str] = deque()
         self.limits = GitHubLimits()
+        self._max_file_bytes = int(self.limits.MAX_FILESIZE_MB * 1024 * 1024)
+        self._warn_file_bytes = int(self.limits.WARNING_FILESIZE_MB * 1024 * 1024)
         self.stats = ValidationStats()
         self.critical_dirs = ['src', 'data']
+        self.excluded_dirs = set(EXCLUDED_DIRS)
+        self._scanned = False
+        self._index: Optional[Dict[str, dict]] = None
+        self._flagged: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
         self._setup_logging()
 
     def _setup_logging(self) -> None:
+        # asctime costs a localtime() + strftime() per record. The report
+        # header carries the wall-clock start instead, and file records
+        # carry relativeCreated, the elapsed milliseconds LogRecord has
+        # already computed.
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+        self._report_handler = BufferedFileHandler(self.report_file)
+        self._report_handler.setFormatter(
+            logging.Formatter('%(relativeCreated)7dms - %(levelname)s - %(message)s'))
         logging.basicConfig(
             level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
-                logging.StreamHandler(),
-                logging.FileHandler(self.report_file)
+                console_handler,
+                self._report_handler
             ]
         )
 
     def log_header(self, section: str) -> None:
-        logging.info(f"\n{'='*80}\n{section}\n{'='*80}")
+        logging.info("\n%s\n%s\n%s", '=' * 80, section, '=' * 80)
 
     def check_file_sizes(self) -> None:
         self.log_header("FILE SIZES")
-        logging.info(f"Limits: Max = {self.limits.MAX_FILESIZE_MB}MB, Warning = {self.limits.WARNING_FILESIZE_MB}MB\n")
+        logging.info("Limits: Max = %sMB, Warning = %sMB\n",
+                     self.limits.MAX_FILESIZE_MB, self.limits.WARNING_FILESIZE_MB)
         
         try:
-            for subdir in self.critical_dirs:
-                dir_path = self.repo_dir / subdir
-                if dir_path.exists():
-                    logging.info(f"\nScanning /{subdir} directory:")
-                    for path in dir_path.rglob('*'):
-                        if path.is_file() and not path.is_symlink():
-                            self.stats.total_files += 1
-                            size_mb = path.stat().st_size / (1024 * 1024)
-                            self._handle_file_size(path, size_mb)
-
-            logging.info("\nScanning remaining repository files:")
-            for path in self.repo_dir.rglob('*'):
-                if path.is_file() and not path.is_symlink():
-                    if not any(str(path).startswith(str(self.repo_dir / d)) for d in self.critical_dirs):
-                        self.stats.total_files += 1
-                        size_mb = path.stat().st_size / (1024 * 1024)
-                        self._handle_file_size(path, size_mb)
-
+            self._scan_once()
+            self._scan_files(self._flagged)
+            if self.auto_move:
+                self._move_large_files()
             if not self.stats.large_files and not self.stats.warning_files:
                 logging.info("✓ No files exceed size limits")
         except Exception as e:
-            logging.error(f"File size check error: {e}")
+            logging.error("File size check error: %s", e)
             raise 
 
-    def _handle_file_size(self, path: Path, size_mb: float) -> None:
-        rel_path = path.relative_to(self.repo_dir)
-        if size_mb > self.limits.MAX_FILESIZE_MB:
+    def _scan_once(self) -> None:
+        """Walk the repository once, merging subtree results in a fixed report order."""
+        if self._scanned:
+            return
+        if self.incremental:
+            self._index = self._load_index()
+        self._flagged = []
+        top_dirs: List[str] = []
+        top_files = list(self._scandir_recursive(str(self.repo_dir), self.stats, top_dirs))
+        rank = {name: i for i, name in enumerate(self.critical_dirs)}
+        top_dirs.sort(key=lambda path: (rank.get(os.path.basename(path), len(rank)), path))
+        n_critical = sum(os.path.basename(path) in rank for path in top_dirs)
+
+        with ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2) as pool:
+            futures = [pool.submit(self._scan_subtree, path) for path in top_dirs]
+            for future in futures[:n_critical]:
+                self._merge_subtree(*future.result())
+            self._flagged.extend(top_files)
+            for future in futures[n_critical:]:
+                self._merge_subtree(*future.result())
+        if self.incremental:
+            self._save_index(self.stats.dir_index)
+        self._scanned = True
+
+    def _scan_subtree(self, path: str) -> Tuple[ValidationStats, List[Tuple[str, int]]]:
+        stats = ValidationStats()
+        flagged = list(self._scandir_recursive(path, stats))
+        return stats, flagged
+
+    def _merge_subtree(self, stats: ValidationStats, flagged: List[Tuple[str, int]]) -> None:
+        self._flagged.extend(flagged)
+        self.stats.merge(stats)
+
+    def _scan_files(self, files: List[Tuple[str, int]]) -> None:
+        for path, size in files:
+            self._handle_file_size(path, size)
+
+    def _move_large_files(self) -> None:
+        """Relocate every over-limit file found by the scan, several at a time."""
+        failed: List[str] = []
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [
+                (path, size, pool.submit(self._relocate, path))
+                for path, size in self._flagged if size > self._max_file_bytes
+            ]
+            for path, size, future in futures:
+                try:
+                    msg = future.result()
+                except Exception as e:
+                    logging.error("Failed to move %s: %s", path, e)
+                    failed.append(self._relpath(path))
+                    continue
+                self._record_issue(logging.INFO, msg)
+                self.stats.total_bytes -= size
+        if failed:
+            msg = f"❌ ERROR: {len(failed)} large file(s) could not be moved: {', '.join(sorted(failed))}"
+            self._record_issue(logging.ERROR, msg)
+
+    def _scandir_recursive(self, path: str, stats: ValidationStats,
+                           defer_dirs: Optional[List[str]] = None) -> Iterator[Tuple[str, int]]:
+        """Yield (path, size) for files above the warning threshold, recording totals into stats."""
+        mtime_ns = None
+        if self._index is not None:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError as e:
+                logging.warning("Skipping unreadable directory %s: %s", self._relpath(path), e)
+                return
+            cached = self._index.get(path)
+            if cached is not None and cached['mtime_ns'] == mtime_ns:
+                yield from self._replay_dir(path, cached, stats, defer_dirs)
+                return
+
+        count = files = nbytes = 0
+        flagged: List[Tuple[str, int]] = []
+        subdirs: List[str] = []
+        # Hot loop: bind lookups to locals, which CPython resolves by index
+        # and PyPy's JIT can specialise.
+        warn_bytes = self._warn_file_bytes
+        is_reg = stat.S_ISREG
+        add_subdir = subdirs.append
+        try:
+            with _scandir(path) as it:
+                for entry in it:
+                    count += 1
+                    if entry.is_dir(follow_symlinks=False):
+                        add_subdir(entry.name)
+                        continue
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError as e:
+                        logging.warning("Skipping %s: %s", self._relpath(os.path.join(path, entry.name)), e)
+                        continue
+                    if is_reg(st.st_mode):
+                        size = st.st_size
+                        files += 1
+                        nbytes += size
+                        if size > warn_bytes:
+                            flagged.append((entry.name, size))
+        except OSError as e:
+            logging.warning("Skipping unreadable directory %s: %s", self._relpath(path), e)
+            return
+        stats.total_files += files
+        stats.total_bytes += nbytes
+        if mtime_ns is not None:
+            stats.dir_index[path] = {
+                'mtime_ns': mtime_ns, 'count': count, 'files': files,
+                'bytes': nbytes, 'flagged': flagged, 'dirs': subdirs,
+            }
+        yield from self._finish_dir(path, count, flagged, subdirs, stats, defer_dirs)
+
+    def _replay_dir(self, path: str, cached: dict, stats: ValidationStats,
+                    defer_dirs: Optional[List[str]]) -> Iterator[Tuple[str, int]]:
+        stats.total_files += cached['files']
+        stats.total_bytes += cached['bytes']
+        stats.dir_index[path] = cached
+        yield from self._finish_dir(path, cached['count'], cached['flagged'], cached['dirs'],
+                                    stats, defer_dirs)
+
+    def _finish_dir(self, path: str, count: int, flagged: List[Tuple[str, int]], subdirs: List[str],
+                    stats: ValidationStats, defer_dirs: Optional[List[str]]) -> Iterator[Tuple[str, int]]:
+        for name, size in flagged:
+            yield os.path.join(path, name), size
+        if count > self.limits.MAX_FILES_PER_DIR:
+            stats.large_dirs.append((path, count))
+        for name in subdirs:
+            if name in self.excluded_dirs:
+                continue
+            subdir = os.path.join(path, name)
+            if defer_dirs is not None:
+                defer_dirs.append(subdir)
+            else:
+                yield from self._scandir_recursive(subdir, stats)
+
+    def _load_index(self) -> Dict[str, dict]:
+        """Read the incremental index; a missing, corrupt or stale-threshold index is ignored."""
+        try:
+            with open(INDEX_FILE) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('warn_bytes') != self._warn_file_bytes:
+            return {}
+        dirs = data.get('dirs')
+        if not isinstance(dirs, dict) or not all(map(_valid_index_entry, dirs.values())):
+            return {}
+        return dirs
+
+    def _save_index(self, dirs: Dict[str, dict]) -> None:
+        """Replace this repo's entries in the index, keeping those of other repos."""
+        index = {
+            path: entry for path, entry in (self._index or {}).items()
+            if not os.path.join(path, '').startswith(self._repo_str)
+        }
+        index.update(dirs)
+        tmp_file = f"{INDEX_FILE}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(INDEX_FILE), exist_ok=True)
+            with open(tmp_file, 'w') as f:
+                json.dump({'warn_bytes': self._warn_file_bytes, 'dirs': index}, f)
+            os.replace(tmp_file, INDEX_FILE)
+        except OSError as e:
+            logging.warning("Could not write incremental index %s: %s", INDEX_FILE, e)
+
+    def _relpath(self, path: str) -> str:
+        """Slice the repo prefix off a path produced by the walker."""
+        return path[len(self._repo_str):] or '.'
+
+    def _record_issue(self, level: int, msg: str) -> None:
+        """Append and log an issue under the lock shared with the move pool."""
+        with self._lock:
+            self.issues.append(msg)
+            logging.log(level, msg)
+
+    def _handle_file_size(self, path: str, size: int) -> None:
+        """Report a file against the size limits."""
+        if size <= self._warn_file_bytes:
+            return
+        rel_path = self._relpath(path)
+        size_mb = size / (1024 * 1024)
+        if size > self._max_file_bytes:
             msg = f"ERROR: {rel_path} is {size_mb:.1f}MB (max {self.limits.MAX_FILESIZE_MB}MB)"
             self.stats.large_files.append((path, size_mb))
-            self.issues.append(msg)
-            logging.error(msg)
-            if self.auto_move:
-                self.move_large_file(path)
-        elif size_mb > self.limits.WARNING_FILESIZE_MB:
+            self._record_issue(logging.ERROR, msg)
+        else:
             msg = f"WARNING: {rel_path} is {size_mb:.1f}MB"
             self.stats.warning_files.append((path, size_mb))
-            self.issues.append(msg)
-            logging.warning(msg)
+            self._record_issue(logging.WARNING, msg)
 
-    def move_large_file(self, file_path: Path) -> None:
+    def move_large_file(self, file_path: str) -> None:
         try:
-            rel_path = file_path.relative_to(self.repo_dir)
-            backup_path = self.backup_dir / rel_path
-            backup_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            stat = file_path.stat()
-            atime, mtime = stat.st_atime, stat.st_mtime
-            size_mb = stat.st_size / (1024 * 1024)
-            
-            shutil.move(str(file_path), str(backup_path))
-            os.symlink(str(backup_path), str(file_path))
-            
-            os.utime(str(backup_path), (atime, mtime))
-            os.utime(str(file_path), (atime, mtime), follow_symlinks=False)
-            
-            msg = f"📦 Moved large file ({size_mb:.1f}MB):\n  From: {rel_path}\n  To: {backup_path}"
-            self.issues.append(msg)
-            logging.info(msg)
+            self._record_issue(logging.INFO, self._relocate(file_path))
         except Exception as e:
-            logging.error(f"Failed to move {file_path}: {e}")
+            logging.error("Failed to move %s: %s", file_path, e)
             raise
 
+    def _relocate(self, file_path: str) -> str:
+        """Move a file to the backup tree, leave a symlink behind and return the report line."""
+        file_path = os.fspath(file_path)
+        if not file_path.startswith(self._repo_str):
+            raise ValueError(f"{file_path} is not inside {self.repo_dir}")
+        rel_path = self._relpath(file_path)
+        backup_path = os.path.join(self._backup_str, rel_path)
+        os.makedirs(os.path.dirname(backup_path), exist_ok=True)
+        
+        st = os.stat(file_path)
+        size_mb = st.st_size / (1024 * 1024)
+        
+        # shutil.move renames when it can and falls back to copy2 on
+        # EXDEV; both keep the file's timestamps.
+        shutil.move(file_path, backup_path)
+        os.symlink(backup_path, file_path)
+        os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns), follow_symlinks=False)
+        
+        return f"📦 Moved large file ({size_mb:.1f}MB):\n  From: {rel_path}\n  To: {backup_path}"
+
     def check_dir_file_counts(self) -> None:
         """Verify directory file counts against GitHub display limits."""
         self.log_header("DIRECTORY FILE COUNTS")
-        logging.info(f"Limit: Max {self.limits.MAX_FILES_PER_DIR} files per directory\n")
+        logging.info("Limit: Max %d files per directory\n", self.limits.MAX_FILES_PER_DIR)
         
         try:
-            for path in self.repo_dir.rglob('*'):
-                if path.is_dir():
-                    files = list(path.glob('*'))
-                    count = len(files)
-                    if count > self.limits.MAX_FILES_PER_DIR:
-                        rel_path = path.relative_to(self.repo_dir)
-                        msg = f"⚠️ WARNING: {rel_path} contains {count} files"
-                        self.stats.large_dirs.append((path, count))
-                        self.issues.append(msg)
-                        logging.warning(msg)
-                        
+            self._scan_once()
+            for path, count in self.stats.large_dirs:
+                rel_path = self._relpath(path)
+                msg = f"⚠️ WARNING: {rel_path} contains {count} files"
+                self._record_issue(logging.WARNING, msg)
+
             if not self.stats.large_dirs:
                 logging.info("✓ No directories exceed file count limit")
         except Exception as e:
-            logging.error(f"Directory check error: {e}")
+            logging.error("Directory check error: %s", e)
             raise
  
     def check_repo_size(self) -> None:
         """Calculate and validate total repository size."""
         self.log_header("REPOSITORY SIZE")
-        logging.info(f"Limits: Max = {self.limits.MAX_REPO_SIZE_GB}GB")
-        logging.info(f"        Warning = {self.limits.WARNING_REPO_SIZE_GB}GB")
-        logging.info(f"        Recommended < {self.limits.RECOMMENDED_REPO_SIZE_GB}GB\n")
+        logging.info("Limits: Max = %sGB", self.limits.MAX_REPO_SIZE_GB)
+        logging.info("        Warning = %sGB", self.limits.WARNING_REPO_SIZE_GB)
+        logging.info("        Recommended < %sGB\n", self.limits.RECOMMENDED_REPO_SIZE_GB)
         
         try:
-            total_bytes = sum(
-                f.stat().st_size for f in self.repo_dir.rglob('*') 
-                if f.is_file() and not f.is_symlink()
-            )
-            self.stats.total_size_gb = total_bytes / (1024**3)
+            self._scan_once()
+            self.stats.total_size_gb = self.stats.total_bytes / (1024**3)
             
             if self.stats.total_size_gb > self.limits.MAX_REPO_SIZE_GB:
                 msg = f"❌ ERROR: Repository size is {self.stats.total_size_gb:.1f}GB"
-                self.issues.append(msg)
-                logging.error(msg)
+                self._record_issue(logging.ERROR, msg)
             elif self.stats.total_size_gb > self.limits.WARNING_REPO_SIZE_GB:
                 msg = f"⚠️ WARNING: Repository size is {self.stats.total_size_gb:.1f}GB"
-                self.issues.append(msg)
-                logging.warning(msg)
+                self._record_issue(logging.WARNING, msg)
             else:
-                logging.info(f"✓ Repository size {self.stats.total_size_gb:.1f}GB is within limits")
+                logging.info("✓ Repository size %.1fGB is within limits", self.stats.total_size_gb)
         except Exception as e:
-            logging.error(f"Repository size check error: {e}")
+            logging.error("Repository size check error: %s", e)
             raise
 
     def validate(self) -> None:
         """Run all repository validation checks."""
         self.log_header("GitHub Repository Validation Report")
-        logging.info(f"Repository: {self.repo_dir}")
-        logging.info(f"Auto-move large files: {self.auto_move}\n")
+        logging.info("Started: %s", self.started.isoformat(sep=' ', timespec='seconds'))
+        logging.info("Repository: %s", self.repo_dir)
+        logging.info("Auto-move large files: %s", self.auto_move)
+        logging.info("Incremental scan: %s", self.incremental)
+        logging.info("Excluded directories: %s\n", ', '.join(sorted(self.excluded_dirs)))
         
-        self.check_file_sizes()
-        self.check_dir_file_counts()
-        self.check_repo_size()
-        
-        self.log_header("VALIDATION SUMMARY")
-        logging.info(f"Total files scanned: {self.stats.total_files}")
-        logging.info(f"Large files found: {len(self.stats.large_files)}")
-        logging.info(f"Warning files found: {len(self.stats.warning_files)}")
-        logging.info(f"Total issues found: {len(self.issues)}")
-        logging.info(f"\nDetailed report saved to: {self.report_file}")
+        try:
+            self.check_file_sizes()
+            self.check_dir_file_counts()
+            self.check_repo_size()
+            
+            self.log_header("VALIDATION SUMMARY")
+            logging.info("Total files scanned: %d", self.stats.total_files)
+            logging.info("Large files found: %d", len(self.stats.large_files))
+            logging.info("Warning files found: %d", len(self.stats.warning_files))
+            logging.info("Total issues found: %d", len(self.issues))
+            logging.info("\nDetailed report saved to: %s", self.report_file)
+        finally:
+            self._report_handler.flush_buffer()
 
 def main():
     REPO_DIR = "~/code/IBM-Notre-Dame-Tech-Ethics-Lab-GenAI-Predict-Human-Behavior"